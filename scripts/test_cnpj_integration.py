@@ -10,6 +10,7 @@ Este script permite testar manualmente as funcionalidades de:
 """
 
 import asyncio
+import importlib
 import json
 import os
 import sys
@@ -19,19 +20,32 @@ from pathlib import Path
 # Adicionar o diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-try:
-    from src.services.cnpj_service import cnpj_service, CNPJServiceError
-    from src.integrations.cnpj_client import cnpj_client, CNPJAPIError
-except ImportError as e:
-    print(f"❌ Erro de importação: {e}")
-    print("Verifique se todas as dependências estão instaladas")
-    sys.exit(1)
+
+def _import_cnpj_modules():
+    """
+    Importa os módulos de CNPJ sob demanda.
+
+    A importação fica adiada até o primeiro teste que precisa dos
+    clientes, para que o menu apareça sem esperar pelos SDKs. Em caso
+    de erro, imprime a causa e relança o ImportError para que o menu
+    volte a ser exibido em vez de encerrar a sessão.
+    """
+    try:
+        cnpj_service_module = importlib.import_module("src.services.cnpj_service")
+        cnpj_client_module = importlib.import_module("src.integrations.cnpj_client")
+    except ImportError as e:
+        print(f"❌ Erro de importação: {e}")
+        print("Verifique se todas as dependências estão instaladas")
+        raise
+    return cnpj_service_module, cnpj_client_module
 
 
 class CNPJTestRunner:
     """Classe para executar testes manuais de CNPJ."""
     
     def __init__(self):
+        self._cnpj_service_module = None
+        self._cnpj_client_module = None
         self.test_cnpjs = [
             "11.222.333/0001-81",  # CNPJ de teste (pode não existir)
             "11222333000181",      # Mesmo CNPJ sem formatação
@@ -39,6 +53,24 @@ class CNPJTestRunner:
             "123",                 # Formato inválido
         ]
     
+    def _load_cnpj_modules(self):
+        """Carrega os módulos de CNPJ na primeira utilização e os retorna."""
+        if self._cnpj_service_module is None:
+            self._cnpj_service_module, self._cnpj_client_module = _import_cnpj_modules()
+        return self._cnpj_service_module, self._cnpj_client_module
+    
+    @property
+    def cnpj_service(self):
+        """Instância do serviço de CNPJ (importada sob demanda)."""
+        self._load_cnpj_modules()
+        return self._cnpj_service_module.cnpj_service
+    
+    @property
+    def cnpj_client(self):
+        """Instância do cliente de CNPJ (importada sob demanda)."""
+        self._load_cnpj_modules()
+        return self._cnpj_client_module.cnpj_client
+    
     def print_header(self, title: str):
         """Imprime cabeçalho formatado."""
         print("\n" + "="*60)
@@ -58,13 +90,13 @@ class CNPJTestRunner:
             print(f"\nTestando CNPJ: {cnpj}")
             
             # Teste de validação básica
-            is_valid = cnpj_client._validate_cnpj(cnpj)
+            is_valid = self.cnpj_client._validate_cnpj(cnpj)
             print(f"Validação básica: {'✅ Válido' if is_valid else '❌ Inválido'}")
             
             if is_valid:
                 # Teste de formatação
-                formatted = cnpj_client._format_cnpj(cnpj)
-                cleaned = cnpj_client._clean_cnpj(cnpj)
+                formatted = self.cnpj_client._format_cnpj(cnpj)
+                cleaned = self.cnpj_client._clean_cnpj(cnpj)
                 print(f"Formatado: {formatted}")
                 print(f"Limpo: {cleaned}")
     
@@ -72,15 +104,18 @@ class CNPJTestRunner:
         """Testa consulta nas APIs de CNPJ."""
         self.print_header("TESTE 2: Consulta nas APIs de CNPJ")
         
+        _, cnpj_client_module = self._load_cnpj_modules()
+        CNPJAPIError = cnpj_client_module.CNPJAPIError
+        
         # Usar apenas CNPJs válidos para teste de API
-        valid_cnpjs = [cnpj for cnpj in self.test_cnpjs if cnpj_client._validate_cnpj(cnpj)]
+        valid_cnpjs = [cnpj for cnpj in self.test_cnpjs if self.cnpj_client._validate_cnpj(cnpj)]
         
         for cnpj in valid_cnpjs[:1]:  # Testar apenas o primeiro para não sobrecarregar APIs
             print(f"\nConsultando CNPJ: {cnpj}")
             
             try:
                 # Teste direto do cliente
-                cnpj_data = await cnpj_client.get_cnpj_data(cnpj)
+                cnpj_data = await self.cnpj_client.get_cnpj_data(cnpj)
                 
                 result = {
                     "cnpj": cnpj_data.cnpj,
@@ -120,13 +155,13 @@ class CNPJTestRunner:
         
         for cnpj, description in test_cases:
             try:
-                is_valid = cnpj_client._validate_cnpj(cnpj)
+                is_valid = self.cnpj_client._validate_cnpj(cnpj)
                 status = "✅ Válido" if is_valid else "❌ Inválido"
                 print(f"{description}: {cnpj} -> {status}")
                 
                 if is_valid:
-                    formatted = cnpj_client._format_cnpj(cnpj)
-                    cleaned = cnpj_client._clean_cnpj(cnpj)
+                    formatted = self.cnpj_client._format_cnpj(cnpj)
+                    cleaned = self.cnpj_client._clean_cnpj(cnpj)
                     print(f"  Formatado: {formatted}")
                     print(f"  Limpo: {cleaned}")
                     
@@ -137,7 +172,7 @@ class CNPJTestRunner:
         """Testa funcionalidades de cache do serviço."""
         self.print_header("TESTE 3: Cache do Serviço de CNPJ")
         
-        valid_cnpjs = [cnpj for cnpj in self.test_cnpjs if cnpj_client._validate_cnpj(cnpj)]
+        valid_cnpjs = [cnpj for cnpj in self.test_cnpjs if self.cnpj_client._validate_cnpj(cnpj)]
         
         if not valid_cnpjs:
             print("❌ Nenhum CNPJ válido para testar cache")
@@ -150,7 +185,7 @@ class CNPJTestRunner:
             # 1. Primeira consulta (deve ir para API)
             print("\n1. Primeira consulta (API)...")
             start_time = datetime.now()
-            result1 = await cnpj_service.get_cnpj_data(cnpj, use_cache=True)
+            result1 = await self.cnpj_service.get_cnpj_data(cnpj, use_cache=True)
             time1 = (datetime.now() - start_time).total_seconds()
             print(f"✅ Consulta realizada em {time1:.2f}s")
             print(f"Fonte: {result1.api_source}")
@@ -158,7 +193,7 @@ class CNPJTestRunner:
             # 2. Segunda consulta (deve usar cache)
             print("\n2. Segunda consulta (cache)...")
             start_time = datetime.now()
-            result2 = await cnpj_service.get_cnpj_data(cnpj, use_cache=True)
+            result2 = await self.cnpj_service.get_cnpj_data(cnpj, use_cache=True)
             time2 = (datetime.now() - start_time).total_seconds()
             print(f"✅ Consulta realizada em {time2:.2f}s")
             print(f"Fonte: {result2.api_source}")
@@ -170,7 +205,7 @@ class CNPJTestRunner:
                 print("❌ Dados do cache são inconsistentes")
             
             # 4. Listar CNPJs em cache
-            cached_list = cnpj_service.list_cached_cnpjs()
+            cached_list = self.cnpj_service.list_cached_cnpjs()
             print(f"\n✅ CNPJs em cache: {len(cached_list)}")
             
         except Exception as e:
@@ -180,7 +215,7 @@ class CNPJTestRunner:
         """Testa geração de cartões CNPJ."""
         self.print_header("TESTE 4: Geração de Cartões CNPJ")
         
-        valid_cnpjs = [cnpj for cnpj in self.test_cnpjs if cnpj_client._validate_cnpj(cnpj)]
+        valid_cnpjs = [cnpj for cnpj in self.test_cnpjs if self.cnpj_client._validate_cnpj(cnpj)]
         
         if not valid_cnpjs:
             print("❌ Nenhum CNPJ válido para testar geração de cartão")
@@ -194,7 +229,7 @@ class CNPJTestRunner:
         
         try:
             # Gerar cartão (sem salvar na base de dados para teste)
-            result = await cnpj_service.gerar_e_armazenar_cartao_cnpj(
+            result = await self.cnpj_service.gerar_e_armazenar_cartao_cnpj(
                 cnpj=cnpj,
                 case_id=case_id,
                 save_to_database=False
@@ -237,7 +272,7 @@ class CNPJTestRunner:
             print(f"\nValidando CNPJ para triagem: {cnpj}")
             
             try:
-                result = await cnpj_service.validate_cnpj_for_triagem(cnpj)
+                result = await self.cnpj_service.validate_cnpj_for_triagem(cnpj)
                 
                 if result["valid"]:
                     print("✅ CNPJ válido para triagem")
@@ -259,25 +294,25 @@ class CNPJTestRunner:
         self.print_header("TESTE 6: Gerenciamento de Cache")
         
         # Estatísticas do cache
-        stats = cnpj_service.get_cnpj_cache_statistics()
+        stats = self.cnpj_service.get_cnpj_cache_statistics()
         print("📊 Estatísticas do cache:")
         self.print_result(stats)
         
         # Listar CNPJs em cache
-        cached_cnpjs = cnpj_service.list_cached_cnpjs()
+        cached_cnpjs = self.cnpj_service.list_cached_cnpjs()
         print(f"\n📋 CNPJs em cache: {len(cached_cnpjs)}")
         for cached in cached_cnpjs[:3]:  # Mostrar apenas os 3 primeiros
             print(f"  - {cached['cnpj']} | {cached['razao_social']} | Válido: {cached['is_valid']}")
         
         # Listar cartões gerados
-        generated_cards = cnpj_service.list_generated_cards()
+        generated_cards = self.cnpj_service.list_generated_cards()
         print(f"\n🗂️ Cartões gerados: {len(generated_cards)}")
         for card in generated_cards[:3]:  # Mostrar apenas os 3 primeiros
             print(f"  - {card['cnpj']} | {card['razao_social']} | {card['generated_at']}")
         
         # Opção de limpeza de cache (comentada para segurança)
         # print("\n🧹 Limpando cache expirado...")
-        # removed = cnpj_service.clear_cache(older_than_hours=24)
+        # removed = self.cnpj_service.clear_cache(older_than_hours=24)
         # print(f"✅ {removed} arquivos de cache removidos")
     
     async def run_all_tests(self):
@@ -285,6 +320,11 @@ class CNPJTestRunner:
         print("🚀 Iniciando testes de integração CNPJ")
         print(f"Timestamp: {datetime.now().isoformat()}")
         
+        try:
+            self._load_cnpj_modules()
+        except ImportError:
+            return
+        
         tests = [
             self.test_simple_validation,
             self.test_cnpj_validation,
@@ -341,27 +381,34 @@ async def main():
         
         choice = input("\nEscolha uma opção: ").strip()
         
-        if choice == "0":
-            print("👋 Saindo...")
-            break
-        elif choice == "1":
-            await runner.test_simple_validation()
-        elif choice == "2":
-            await runner.test_cnpj_validation()
-        elif choice == "3":
-            await runner.test_cnpj_api_query()
-        elif choice == "4":
-            await runner.test_cnpj_service_cache()
-        elif choice == "5":
-            await runner.test_cnpj_card_generation()
-        elif choice == "6":
-            await runner.test_cnpj_validation_for_triagem()
-        elif choice == "7":
-            await runner.test_cache_management()
-        elif choice == "8":
-            await runner.run_all_tests()
-        else:
-            print("❌ Opção inválida!")
+        try:
+            if choice in {"1", "2", "3", "4", "5", "6", "7", "8"}:
+                runner._load_cnpj_modules()
+            
+            if choice == "0":
+                print("👋 Saindo...")
+                break
+            elif choice == "1":
+                await runner.test_simple_validation()
+            elif choice == "2":
+                await runner.test_cnpj_validation()
+            elif choice == "3":
+                await runner.test_cnpj_api_query()
+            elif choice == "4":
+                await runner.test_cnpj_service_cache()
+            elif choice == "5":
+                await runner.test_cnpj_card_generation()
+            elif choice == "6":
+                await runner.test_cnpj_validation_for_triagem()
+            elif choice == "7":
+                await runner.test_cache_management()
+            elif choice == "8":
+                await runner.run_all_tests()
+            else:
+                print("❌ Opção inválida!")
+        except ImportError:
+            # Dependências ausentes: volta ao menu em vez de encerrar
+            print("↩️ Voltando ao menu...")
         
         input("\nPressione Enter para continuar...")
 